@@ -4,6 +4,16 @@ from abc import ABC, abstractmethod
 import json
 import sqlite3
 import re
+import os
+import sys
+import time
+import queue
+import secrets
+import tempfile
+import threading
+import unicodedata
+from difflib import SequenceMatcher
+from datetime import datetime
 
 # ------------------------- CLASSES DO SISTEMA -------------------------
 
@@ -27,10 +37,11 @@ class Pessoa(ABC):
 
 class Participante(Pessoa):
     """Classe que representa um participante."""
-    def __init__(self, nome, email, telefone, id=None):
+    def __init__(self, nome, email, telefone, id=None, token_qr=None):
         super().__init__(nome, email)
         self.telefone = telefone
         self.id = id
+        self.token_qr = token_qr
 
     def exibir_dados(self):
         return f"Nome: {self.nome}, Email: {self.email}, Telefone: {self.telefone}"
@@ -41,7 +52,8 @@ class Participante(Pessoa):
             "id": self.id,
             "nome": self.nome,
             "email": self.email,
-            "telefone": self.telefone
+            "telefone": self.telefone,
+            "token_qr": self.token_qr
         }
 
 class Evento:
@@ -70,6 +82,653 @@ class Evento:
             "participantes": [p.to_dict() for p in self.participantes]
         }
 
+# ------------------------- BANCO DE DADOS -------------------------
+
+CAMINHO_DB = "EventSync.db"
+
+def conectar(caminho_db=CAMINHO_DB):
+    """Abre uma conexão SQLite configurada para leitores e escritor simultâneos."""
+    conn = sqlite3.connect(caminho_db, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")  # Leituras não bloqueiam a gravação das presenças
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def gerar_token_qr():
+    """Gera um token aleatório para o QR code de check-in do participante."""
+    return secrets.token_hex(8)
+
+def normalizar_email(email):
+    """Retorna a chave canônica do email (sem espaços e em minúsculas)."""
+    return email.strip().lower()
+
+def normalizar_telefone(telefone):
+    """Retorna a chave canônica do telefone: apenas dígitos, sem o código do Brasil."""
+    digitos = re.sub(r'\D', '', telefone).lstrip("0")
+    if digitos.startswith("55") and len(digitos) in (12, 13):  # +55 DDD número
+        digitos = digitos[2:]
+    return digitos
+
+def normalizar_nome(nome):
+    """Retorna o nome sem acentos, pontuação e espaços repetidos, em minúsculas.
+
+    Letras de qualquer alfabeto são mantidas ("Иван", "王伟"); apenas os acentos são removidos.
+    """
+    decomposto = unicodedata.normalize("NFKD", nome.casefold())
+    letras = "".join(c if c.isalpha() else " " for c in decomposto if not unicodedata.combining(c))
+    return " ".join(letras.split())
+
+def criar_esquema(cursor):
+    """Cria as tabelas e índices no banco de dados, se não existirem."""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS eventos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        titulo TEXT NOT NULL,
+        data TEXT NOT NULL,
+        local TEXT NOT NULL,
+        capacidade INTEGER NOT NULL
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS participantes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nome TEXT NOT NULL,
+        email TEXT NOT NULL,
+        telefone TEXT NOT NULL,
+        token_qr TEXT,
+        email_canonico TEXT,
+        telefone_canonico TEXT
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS inscricoes (
+        evento_id INTEGER NOT NULL,
+        participante_id INTEGER NOT NULL,
+        FOREIGN KEY (evento_id) REFERENCES eventos(id),
+        FOREIGN KEY (participante_id) REFERENCES participantes(id)
+    )
+    ''')
+
+    # Registro de chegadas: o check-in apenas insere e nenhuma linha é atualizada;
+    # as linhas só são apagadas junto com o evento, o participante ou a inscrição
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS presencas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        evento_id INTEGER NOT NULL,
+        participante_id INTEGER NOT NULL,
+        registrado_em TEXT NOT NULL,
+        FOREIGN KEY (evento_id) REFERENCES eventos(id),
+        FOREIGN KEY (participante_id) REFERENCES participantes(id)
+    )
+    ''')
+
+    # Chaves dos participantes removidos por mesclagem, que continuam valendo no check-in
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS participantes_mesclados (
+        antigo_id INTEGER PRIMARY KEY,
+        novo_id INTEGER NOT NULL,
+        token_qr TEXT,
+        email_canonico TEXT,
+        telefone_canonico TEXT,
+        FOREIGN KEY (novo_id) REFERENCES participantes(id)
+    )
+    ''')
+
+    # Bancos antigos não possuem as colunas do token QR e das chaves canônicas
+    cursor.execute("PRAGMA table_info(participantes)")
+    colunas = [coluna[1] for coluna in cursor.fetchall()]
+    for coluna in ("token_qr", "email_canonico", "telefone_canonico"):
+        if coluna not in colunas:
+            cursor.execute(f"ALTER TABLE participantes ADD COLUMN {coluna} TEXT")
+
+    cursor.execute("SELECT id FROM participantes WHERE token_qr IS NULL")
+    for (participante_id,) in cursor.fetchall():
+        cursor.execute("UPDATE participantes SET token_qr = ? WHERE id = ?", (gerar_token_qr(), participante_id))
+
+    cursor.execute("SELECT id, email, telefone FROM participantes WHERE email_canonico IS NULL OR telefone_canonico IS NULL")
+    for participante_id, email, telefone in cursor.fetchall():
+        cursor.execute(
+            "UPDATE participantes SET email_canonico = ?, telefone_canonico = ? WHERE id = ?",
+            (normalizar_email(email), normalizar_telefone(telefone), participante_id)
+        )
+
+    # Índices usados pela busca do check-in e pela detecção de duplicatas
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_participantes_email_canonico ON participantes (email_canonico)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_participantes_telefone_canonico ON participantes (telefone_canonico)")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_participantes_token_qr ON participantes (token_qr)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_inscricoes_evento_participante ON inscricoes (evento_id, participante_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_mesclados_novo_id ON participantes_mesclados (novo_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_mesclados_email_canonico ON participantes_mesclados (email_canonico)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_mesclados_telefone_canonico ON participantes_mesclados (telefone_canonico)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_mesclados_token_qr ON participantes_mesclados (token_qr)")
+
+# ------------------------- CHECK-IN -------------------------
+
+CHECKIN_OK = "ok"
+CHECKIN_DUPLICADO = "duplicado"
+CHECKIN_NAO_ENCONTRADO = "nao_encontrado"
+CHECKIN_NAO_INSCRITO = "nao_inscrito"
+
+MENSAGENS_CHECKIN = {
+    CHECKIN_OK: "Bem-vindo(a), {nome}!",
+    CHECKIN_DUPLICADO: "{nome} já realizou o check-in neste evento.",
+    CHECKIN_NAO_ENCONTRADO: "Participante não encontrado.",
+    CHECKIN_NAO_INSCRITO: "{nome} não está inscrito(a) neste evento.",
+}
+
+class RegistroPresencas:
+    """Grava as presenças em lote por meio de uma thread dedicada.
+
+    As chegadas são enfileiradas e gravadas com um único commit a cada
+    `intervalo_ms` milissegundos ou `tamanho_lote` registros, o que ocorrer
+    primeiro. Os contadores por evento são atualizados em memória no momento
+    da chegada, sem esperar pela gravação.
+    """
+    def __init__(self, caminho_db=CAMINHO_DB, intervalo_ms=50, tamanho_lote=200, tentativas=5):
+        self.caminho_db = caminho_db
+        self.intervalo = intervalo_ms / 1000
+        self.tamanho_lote = tamanho_lote
+        self.tentativas = tentativas  # Tentativas de gravação de um lote com o banco ocupado
+        self.erro = None  # Exceção que interrompeu a thread de gravação, se houver
+        self._fila = queue.Queue()
+        self._lock = threading.Lock()
+        self._presentes = set()
+        self._contadores = {}
+
+        # Carrega as presenças já gravadas para manter os contadores,
+        # atribuindo as de participantes mesclados a quem os substituiu
+        conn = conectar(caminho_db)
+        for evento_id, participante_id in conn.execute(
+            '''SELECT DISTINCT pr.evento_id, COALESCE(m.novo_id, pr.participante_id)
+               FROM presencas pr
+               LEFT JOIN participantes_mesclados m ON m.antigo_id = pr.participante_id'''
+        ):
+            self._presentes.add((evento_id, participante_id))
+            self._contadores[evento_id] = self._contadores.get(evento_id, 0) + 1
+        conn.close()
+
+        self._thread = threading.Thread(target=self._gravar_lotes, daemon=True)
+        self._thread.start()
+
+    def registrar(self, evento_id, participante_id):
+        """Enfileira a chegada. Retorna False se o participante já fez check-in no evento."""
+        self._verificar_gravacao()
+        chave = (evento_id, participante_id)
+        with self._lock:
+            if chave in self._presentes:
+                return False
+            self._presentes.add(chave)
+            self._contadores[evento_id] = self._contadores.get(evento_id, 0) + 1
+        self._fila.put((evento_id, participante_id, datetime.now().isoformat(timespec="milliseconds")))
+        return True
+
+    def chegadas(self, evento_id):
+        """Retorna o número de chegadas registradas para o evento."""
+        with self._lock:
+            return self._contadores.get(evento_id, 0)
+
+    def substituir_participante(self, antigo_id, novo_id):
+        """Transfere as presenças em memória de um participante mesclado para outro."""
+        with self._lock:
+            for evento_id, participante_id in [chave for chave in self._presentes if chave[1] == antigo_id]:
+                self._presentes.discard((evento_id, participante_id))
+                if (evento_id, novo_id) in self._presentes:
+                    self._contadores[evento_id] -= 1  # As duas chegadas eram da mesma pessoa
+                else:
+                    self._presentes.add((evento_id, novo_id))
+
+    def descartar(self, evento_id=None, participante_id=None):
+        """Remove da memória as presenças de um evento, de um participante ou de ambos (inscrição)."""
+        with self._lock:
+            for chave in list(self._presentes):
+                if (evento_id is None or chave[0] == evento_id) and (participante_id is None or chave[1] == participante_id):
+                    self._presentes.discard(chave)
+                    self._contadores[chave[0]] -= 1
+
+    def descarregar(self, timeout=10):
+        """Aguarda até que todas as chegadas enfileiradas estejam gravadas.
+
+        Lança RuntimeError se a gravação falhou ou não terminou dentro do `timeout`.
+        """
+        self._verificar_gravacao()
+        concluido = threading.Event()
+        self._fila.put(concluido)
+        if not concluido.wait(timeout):
+            raise RuntimeError("Tempo esgotado ao gravar as presenças.")
+        self._verificar_gravacao()
+
+    def fechar(self, timeout=10):
+        """Grava as chegadas pendentes e encerra a thread de gravação."""
+        if self._thread.is_alive():
+            self._fila.put(None)
+            self._thread.join(timeout)
+
+    def _verificar_gravacao(self):
+        """Lança RuntimeError se a thread de gravação foi interrompida."""
+        if self.erro is not None or not self._thread.is_alive():
+            raise RuntimeError(f"A gravação das presenças foi interrompida: {self.erro}")
+
+    def _gravar_lotes(self):
+        """Laço da thread de gravação (group commit)."""
+        conn = None
+        try:
+            conn = conectar(self.caminho_db)
+            self._processar_fila(conn)
+        except Exception as erro:
+            self.erro = erro
+            print(f"Erro ao gravar presenças: {erro}", file=sys.stderr)
+            # Libera quem estiver aguardando em descarregar()
+            while True:
+                try:
+                    item = self._fila.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(item, threading.Event):
+                    item.set()
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _processar_fila(self, conn):
+        """Agrupa as chegadas da fila em lotes e grava cada lote com um único commit."""
+        ativo = True
+        while ativo:
+            item = self._fila.get()
+            lote, sinais = [], []
+            limite = time.monotonic() + self.intervalo
+            while True:
+                if item is None:
+                    ativo = False
+                    break
+                if isinstance(item, threading.Event):
+                    sinais.append(item)
+                    break
+                lote.append(item)
+                restante = limite - time.monotonic()
+                if len(lote) >= self.tamanho_lote or restante <= 0:
+                    break
+                try:
+                    item = self._fila.get(timeout=restante)
+                except queue.Empty:
+                    break
+
+            try:
+                self._gravar_lote(conn, lote)
+            except Exception:
+                # Os sinais voltam para a fila e são liberados depois de registrado o erro
+                for sinal in sinais:
+                    self._fila.put(sinal)
+                raise
+            for sinal in sinais:
+                sinal.set()
+
+    def _gravar_lote(self, conn, lote):
+        """Grava um lote, tentando novamente algumas vezes se o banco estiver ocupado."""
+        for tentativa in range(self.tentativas):
+            if not lote:
+                return
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO presencas (evento_id, participante_id, registrado_em) VALUES (?, ?, ?)",
+                        lote
+                    )
+                return
+            except sqlite3.OperationalError:
+                if tentativa == self.tentativas - 1:
+                    raise
+                time.sleep(self.intervalo)  # Banco ocupado: tenta novamente
+
+class ControleCheckin:
+    """Localiza participantes por email, telefone ou token QR e registra a chegada."""
+    def __init__(self, registro, caminho_db=CAMINHO_DB):
+        self.registro = registro
+        self.caminho_db = caminho_db
+        self._local = threading.local()  # Uma conexão por portão (thread)
+
+    def _conexao(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = conectar(self.caminho_db)
+        return conn
+
+    def buscar_participante(self, chave, evento_id=None):
+        """Retorna (id, nome, inscrito) do participante ou None se não encontrado.
+
+        Também encontra participantes pelas chaves de cadastros mesclados a eles. Se a
+        chave pertencer a mais de um cadastro, o inscrito no evento tem preferência.
+        """
+        chave = chave.strip()
+        telefone = normalizar_telefone(chave) or None  # Sem dígitos não há telefone a buscar
+        cursor = self._conexao().execute(
+            '''SELECT p.id, p.nome,
+                      EXISTS (SELECT 1 FROM inscricoes i WHERE i.evento_id = ? AND i.participante_id = p.id) AS inscrito
+               FROM participantes p
+               WHERE p.id IN (
+                   SELECT id FROM participantes
+                   WHERE email_canonico = ? OR telefone_canonico = ? OR token_qr = ?
+                   UNION
+                   SELECT novo_id FROM participantes_mesclados
+                   WHERE email_canonico = ? OR telefone_canonico = ? OR token_qr = ?
+               )
+               ORDER BY inscrito DESC, p.id
+               LIMIT 1''',
+            (evento_id, *(normalizar_email(chave), telefone, chave) * 2)
+        )
+        return cursor.fetchone()
+
+    def realizar_checkin(self, evento_id, chave):
+        """Registra a chegada ao evento. Retorna (status, nome do participante)."""
+        encontrado = self.buscar_participante(chave, evento_id)
+        if encontrado is None:
+            return CHECKIN_NAO_ENCONTRADO, None
+
+        participante_id, nome, inscrito = encontrado
+        if not inscrito:
+            return CHECKIN_NAO_INSCRITO, nome
+        if not self.registro.registrar(evento_id, participante_id):
+            return CHECKIN_DUPLICADO, nome
+        return CHECKIN_OK, nome
+
+def benchmark_checkin(num_portoes=4, num_participantes=5000, intervalo_ms=50, tamanho_lote=200):
+    """Mede a vazão do check-in simulando vários portões em paralelo num banco temporário."""
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho_db = os.path.join(pasta, "EventSync_Benchmark.db")
+        conn = conectar(caminho_db)
+        criar_esquema(conn.cursor())
+        cursor = conn.execute(
+            "INSERT INTO eventos (titulo, data, local, capacidade) VALUES (?, ?, ?, ?)",
+            ("Benchmark", "01/Janeiro/2023", "Auditório", num_participantes)
+        )
+        evento_id = cursor.lastrowid
+
+        # Cada participante chega por um meio diferente: email, telefone ou QR
+        chaves = []
+        for i in range(num_participantes):
+            email = f"participante{i}@exemplo.com"
+            telefone = f"+5511{i:09d}"
+            token = gerar_token_qr()
+            cursor = conn.execute(
+                '''INSERT INTO participantes (nome, email, telefone, token_qr, email_canonico, telefone_canonico)
+                   VALUES (?, ?, ?, ?, ?, ?)''',
+                (f"Participante {i}", email, telefone, token, normalizar_email(email), normalizar_telefone(telefone))
+            )
+            conn.execute("INSERT INTO inscricoes (evento_id, participante_id) VALUES (?, ?)", (evento_id, cursor.lastrowid))
+            chaves.append((email, telefone, token)[i % 3])
+        conn.commit()
+
+        registro = RegistroPresencas(caminho_db, intervalo_ms, tamanho_lote)
+        controle = ControleCheckin(registro, caminho_db)
+        falhas = []
+
+        def portao(chaves_portao):
+            for chave in chaves_portao:
+                status, _ = controle.realizar_checkin(evento_id, chave)
+                if status != CHECKIN_OK:
+                    falhas.append((chave, status))
+
+        portoes = [threading.Thread(target=portao, args=(chaves[i::num_portoes],)) for i in range(num_portoes)]
+        inicio = time.perf_counter()
+        for thread in portoes:
+            thread.start()
+        for thread in portoes:
+            thread.join()
+        registro.descarregar()
+        duracao = time.perf_counter() - inicio
+        registro.fechar()
+
+        gravadas = conn.execute("SELECT COUNT(*) FROM presencas WHERE evento_id = ?", (evento_id,)).fetchone()[0]
+        conn.close()
+
+    taxa = num_participantes / duracao
+    print(f"Portões: {num_portoes}, check-ins: {num_participantes}, falhas: {len(falhas)}")
+    print(f"Presenças gravadas: {gravadas}, contador: {registro.chegadas(evento_id)}")
+    print(f"Tempo: {duracao:.2f} s, vazão: {taxa:.0f} check-ins/s")
+    return taxa
+
+# ------------------------- DUPLICATAS -------------------------
+
+class DetectorDuplicatas:
+    """Encontra e mescla participantes duplicados.
+
+    Emails e telefones iguais após a normalização são encontrados pelos índices
+    das chaves canônicas. Para nomes parecidos, os participantes são agrupados
+    em blocos (nome e sobrenome em qualquer ordem, usuário do email, final do
+    telefone) e apenas os pares de um mesmo bloco são comparados, evitando
+    comparar todos com todos. Blocos grandes, comuns em nomes como "Maria S",
+    são ordenados pelas palavras do nome em ordem alfabética e cada participante
+    é comparado só com os `janela` vizinhos seguintes.
+    """
+    PARTICULAS = {"da", "de", "do", "das", "dos", "e"}
+
+    def __init__(self, conn, limiar_nome=0.85, limiar_contato=0.6, tamanho_max_bloco=50, janela=10):
+        self.conn = conn
+        self.limiar_nome = limiar_nome  # Similaridade mínima quando só o nome coincide
+        self.limiar_contato = limiar_contato  # Similaridade mínima quando email ou telefone se parecem
+        self.tamanho_max_bloco = tamanho_max_bloco  # Até este tamanho, todos os pares do bloco são comparados
+        self.janela = janela  # Vizinhos comparados em blocos maiores que tamanho_max_bloco
+
+    def encontrar_duplicatas(self, conn=None):
+        """Retorna os pares suspeitos como (id_a, id_b, motivo, similaridade), do mais provável ao menos.
+
+        `conn` permite fazer a busca em outra thread, com uma conexão própria; o padrão é `self.conn`.
+        """
+        conn = conn or self.conn
+        pares = {}
+
+        def adicionar(id_a, id_b, motivo, similaridade):
+            chave = (min(id_a, id_b), max(id_a, id_b))
+            if chave not in pares or similaridade > pares[chave][1]:
+                pares[chave] = (motivo, similaridade)
+
+        # Correspondências exatas das chaves canônicas
+        for coluna, motivo in (("email_canonico", "email"), ("telefone_canonico", "telefone")):
+            cursor = conn.execute(
+                f'''SELECT GROUP_CONCAT(id) FROM participantes
+                    WHERE {coluna} <> ''
+                    GROUP BY {coluna} HAVING COUNT(*) > 1'''
+            )
+            for (ids,) in cursor.fetchall():
+                ids = sorted(int(i) for i in ids.split(","))
+                for outro in ids[1:]:
+                    adicionar(ids[0], outro, motivo, 1.0)
+
+        # Blocagem para nomes parecidos
+        nomes = {}
+        blocos = {}
+        cursor = conn.execute("SELECT id, nome, email_canonico, telefone_canonico FROM participantes")
+        for participante_id, nome, email_canonico, telefone_canonico in cursor.fetchall():
+            nomes[participante_id] = normalizar_nome(nome)
+            for chave in self._chaves_bloco(nomes[participante_id], email_canonico or "", telefone_canonico or ""):
+                blocos.setdefault(chave, []).append(participante_id)
+
+        # Um mesmo par costuma aparecer em vários blocos e é comparado uma só vez;
+        # os blocos de email e telefone vêm primeiro porque o limiar deles é menor
+        comparados = set()
+        for (tipo, _), ids in sorted(blocos.items(), key=lambda bloco: bloco[0][0] == "nome"):
+            limiar = self.limiar_nome if tipo == "nome" else self.limiar_contato
+            comparador, atual = None, None
+            for id_a, id_b in self._pares_bloco(ids, nomes):
+                par = (min(id_a, id_b), max(id_a, id_b))
+                if par in comparados:
+                    continue
+                comparados.add(par)
+
+                # Limites superiores baratos (as duas comparações usam as mesmas letras),
+                # reaproveitando a análise do nome de id_a para todos os seus vizinhos
+                tamanhos = len(nomes[id_a]) + len(nomes[id_b])
+                if 2 * min(len(nomes[id_a]), len(nomes[id_b])) < limiar * tamanhos:
+                    continue
+                if id_a != atual:
+                    comparador, atual = SequenceMatcher(None, "", nomes[id_a]), id_a
+                comparador.set_seq1(nomes[id_b])
+                if comparador.quick_ratio() < limiar:
+                    continue
+                similaridade = self.similaridade_nomes(nomes[par[0]], nomes[par[1]])
+                if similaridade >= limiar:
+                    adicionar(*par, tipo, similaridade)
+
+        return sorted(
+            ((id_a, id_b, motivo, similaridade) for (id_a, id_b), (motivo, similaridade) in pares.items()),
+            key=lambda par: (-par[3], par[0], par[1])
+        )
+
+    def _pares_bloco(self, ids, nomes):
+        """Gera os pares a comparar dentro de um bloco."""
+        if len(ids) <= self.tamanho_max_bloco:
+            for i, id_a in enumerate(ids):
+                for id_b in ids[i + 1:]:
+                    yield id_a, id_b
+            return
+
+        # Vizinhança ordenada pelas mesmas palavras usadas nas chaves de bloco, para que
+        # "Maria Souza", "Souza Maria" e "Maria de Souza" fiquem lado a lado
+        ordenados = sorted(ids, key=lambda i: " ".join(self._palavras_ordenadas(nomes[i])))
+        for i, id_a in enumerate(ordenados):
+            for id_b in ordenados[i + 1:i + 1 + self.janela]:
+                yield id_a, id_b
+
+    @classmethod
+    def _palavras_ordenadas(cls, nome):
+        """Retorna as palavras do nome normalizado em ordem alfabética, sem partículas como "da" e "dos"."""
+        partes = nome.split()
+        return sorted(parte for parte in partes if parte not in cls.PARTICULAS) or sorted(partes)
+
+    @classmethod
+    def _chaves_bloco(cls, nome, email_canonico, telefone_canonico):
+        """Retorna as chaves de bloco de um participante."""
+        chaves = set()
+        partes = nome.split()
+        if len(partes) == 1:
+            chaves.add(("nome", partes[0]))
+        elif partes:
+            chaves.add(("nome", f"{partes[0]} {partes[-1][0]}"))  # "joao s"
+            chaves.add(("nome", f"{partes[0][0]} {partes[-1]}"))  # "j silva"
+
+            # Palavras em ordem alfabética: "Silva Joao" cai nos mesmos blocos que "Joao da Silva"
+            ordenadas = cls._palavras_ordenadas(nome)
+            chaves.add(("nome", f"{ordenadas[0]} {ordenadas[-1][0]}"))
+            chaves.add(("nome", f"{ordenadas[0][0]} {ordenadas[-1]}"))
+
+        usuario = re.sub(r'[^a-z0-9]', '', email_canonico.split("@")[0].split("+")[0])
+        if len(usuario) >= 3:
+            chaves.add(("email", usuario))
+        if len(telefone_canonico) >= 8:
+            chaves.add(("telefone", telefone_canonico[-8:]))
+        return chaves
+
+    @staticmethod
+    def similaridade_nomes(nome_a, nome_b):
+        """Similaridade entre 0 e 1 de dois nomes normalizados, tolerando a troca de ordem.
+
+        Um nome vazio (só pontuação, por exemplo) não é evidência de nada e vale 0.
+        """
+        if not nome_a or not nome_b:
+            return 0.0
+        direta = SequenceMatcher(None, nome_a, nome_b).ratio()
+        ordenada = SequenceMatcher(None, " ".join(sorted(nome_a.split())), " ".join(sorted(nome_b.split()))).ratio()
+        return max(direta, ordenada)
+
+    def mesclar(self, manter_id, remover_id, registro=None):
+        """Mescla `remover_id` em `manter_id`, transferindo as inscrições.
+
+        Tudo ocorre numa única transação. Inscrições dos dois participantes no
+        mesmo evento viram uma só, liberando a vaga; assim nenhum evento fica
+        com mais inscritos do que tinha e a capacidade é respeitada. O token QR,
+        o email e o telefone do participante removido são guardados em
+        `participantes_mesclados` e continuam valendo no check-in; as presenças
+        não são alteradas e passam a contar para `manter_id`.
+        """
+        if manter_id == remover_id:
+            raise ValueError("Não é possível mesclar um participante com ele mesmo.")
+
+        with self.conn:
+            cursor = self.conn.cursor()
+            if not self.conn.in_transaction:
+                cursor.execute("BEGIN IMMEDIATE")  # Ninguém altera os dois cadastros durante a mesclagem
+
+            cursor.execute(
+                "SELECT id, token_qr, email_canonico, telefone_canonico FROM participantes WHERE id IN (?, ?)",
+                (manter_id, remover_id)
+            )
+            encontrados = {linha[0]: linha[1:] for linha in cursor.fetchall()}
+            if manter_id not in encontrados or remover_id not in encontrados:
+                raise ValueError("Participante não encontrado. Atualize a lista de duplicatas.")
+
+            # Apelidos que apontavam para o participante removido passam para quem fica
+            cursor.execute("UPDATE participantes_mesclados SET novo_id = ? WHERE novo_id = ?", (manter_id, remover_id))
+            cursor.execute(
+                '''INSERT INTO participantes_mesclados (antigo_id, novo_id, token_qr, email_canonico, telefone_canonico)
+                   VALUES (?, ?, ?, ?, ?)''',
+                (remover_id, manter_id, *encontrados[remover_id])
+            )
+
+            cursor.execute("UPDATE inscricoes SET participante_id = ? WHERE participante_id = ?", (manter_id, remover_id))
+
+            # Mantém uma única inscrição por evento
+            cursor.execute(
+                '''DELETE FROM inscricoes WHERE participante_id = ? AND rowid NOT IN
+                   (SELECT MIN(rowid) FROM inscricoes WHERE participante_id = ? GROUP BY evento_id)''',
+                (manter_id, manter_id)
+            )
+
+            cursor.execute("DELETE FROM participantes WHERE id = ?", (remover_id,))
+
+        if registro:
+            registro.substituir_participante(remover_id, manter_id)
+
+def verificar_duplicatas():
+    """Confere, num banco temporário, casos conhecidos da detecção de duplicatas. Retorna True se todos passarem."""
+    nomes_meio = ["Eduarda", "Fernanda", "Helena", "Clara", "Luiza", "Alice", "Julia", "Beatriz", "Cecilia",
+                  "Vitoria", "Laura", "Sofia", "Valentina", "Heloisa", "Isabel", "Lorena", "Marina", "Yasmin"]
+    participantes = [
+        ("Maria dos Santos", "mds@a.com", "+5511900000001"),
+        ("Maria Santos", "ms@b.com", "+5511900000002"),
+        ("Maria Souza", "souza1@a.com", "+5511900000003"),
+        ("Souza Maria", "souza2@b.com", "+5511900000004"),
+        ("Иван", "ivan@a.com", "+5511900000005"),
+        ("Петр", "ivan@b.com", "+5511900000006"),
+        ("...", "anon@a.com", "+5511900000007"),
+        ("---", "anon@b.com", "+5511900000008"),
+    ]
+    # Bloco "maria s" maior que tamanho_max_bloco, com nomes distintos entre o par acima
+    for i in range(72):
+        sufixo = f"{nomes_meio[i % len(nomes_meio)]} {nomes_meio[(i % len(nomes_meio) + i // len(nomes_meio) + 1) % len(nomes_meio)]}"
+        participantes.append((f"Maria {sufixo} Santos", f"maria{i}@c.com", f"+5521{i:09d}"))
+
+    with tempfile.TemporaryDirectory() as pasta:
+        conn = conectar(os.path.join(pasta, "EventSync_Verificacao.db"))
+        criar_esquema(conn.cursor())
+        ids = {}
+        for nome, email, telefone in participantes:
+            cursor = conn.execute(
+                '''INSERT INTO participantes (nome, email, telefone, token_qr, email_canonico, telefone_canonico)
+                   VALUES (?, ?, ?, ?, ?, ?)''',
+                (nome, email, telefone, gerar_token_qr(), normalizar_email(email), normalizar_telefone(telefone))
+            )
+            ids[nome] = cursor.lastrowid
+        conn.commit()
+
+        detector = DetectorDuplicatas(conn)
+        tamanho_bloco = sum(1 for nome, _, _ in participantes if ("nome", "maria s") in detector._chaves_bloco(normalizar_nome(nome), "", ""))
+        pares = {(id_a, id_b) for id_a, id_b, _, _ in detector.encontrar_duplicatas()}
+        conn.close()
+
+    def par(nome_a, nome_b):
+        return (min(ids[nome_a], ids[nome_b]), max(ids[nome_a], ids[nome_b]))
+
+    verificacoes = [
+        (f"bloco \"maria s\" maior que o limite ({tamanho_bloco} > {detector.tamanho_max_bloco})", tamanho_bloco > detector.tamanho_max_bloco),
+        ("\"Maria dos Santos\" e \"Maria Santos\" no bloco grande", par("Maria dos Santos", "Maria Santos") in pares),
+        ("\"Maria Souza\" e \"Souza Maria\"", par("Maria Souza", "Souza Maria") in pares),
+        ("\"Иван\" e \"Петр\" não são duplicatas", par("Иван", "Петр") not in pares),
+        ("nomes só com pontuação não são duplicatas", par("...", "---") not in pares),
+    ]
+    for descricao, ok in verificacoes:
+        print(f"{'OK' if ok else 'FALHOU'}: {descricao}")
+    return all(ok for _, ok in verificacoes)
+
 # ------------------------- LÓGICA DE INTERFACE GRÁFICA -------------------------
 
 class SistemaGerenciamentoEventos:
@@ -94,41 +753,22 @@ class SistemaGerenciamentoEventos:
         self.participantes = []
 
         # Configurar banco de dados
-        self.conn = sqlite3.connect("EventSync.db")
+        self.conn = conectar(CAMINHO_DB)
         self.cursor = self.conn.cursor()
         self.criar_tabelas()
         self.carregar_dados()
+
+        # Check-in com gravação das presenças em lote
+        self.registro_presencas = RegistroPresencas(CAMINHO_DB)
+        self.checkin = ControleCheckin(self.registro_presencas, CAMINHO_DB)
+        self.detector_duplicatas = DetectorDuplicatas(self.conn)
+        self.root.protocol("WM_DELETE_WINDOW", self.encerrar)
+
         self.setup_ui()
 
     def criar_tabelas(self):
         """Cria as tabelas no banco de dados, se não existirem."""
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS eventos (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            titulo TEXT NOT NULL,
-            data TEXT NOT NULL,
-            local TEXT NOT NULL,
-            capacidade INTEGER NOT NULL
-        )
-        ''')
-
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS participantes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nome TEXT NOT NULL,
-            email TEXT NOT NULL,
-            telefone TEXT NOT NULL
-        )
-        ''')
-
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS inscricoes (
-            evento_id INTEGER NOT NULL,
-            participante_id INTEGER NOT NULL,
-            FOREIGN KEY (evento_id) REFERENCES eventos(id),
-            FOREIGN KEY (participante_id) REFERENCES participantes(id)
-        )
-        ''')
+        criar_esquema(self.cursor)
         self.conn.commit()
 
     def carregar_dados(self):
@@ -140,11 +780,11 @@ class SistemaGerenciamentoEventos:
             evento_obj = Evento(evento[1], evento[2], evento[3], evento[4], evento[0])
             self.eventos.append(evento_obj)
 
-        self.cursor.execute("SELECT * FROM participantes")
+        self.cursor.execute("SELECT id, nome, email, telefone, token_qr FROM participantes")
         participantes_db = self.cursor.fetchall()
         self.participantes.clear()  # Limpa a lista antes de carregar novos dados
         for participante in participantes_db:
-            participante_obj = Participante(participante[1], participante[2], participante[3], participante[0])
+            participante_obj = Participante(participante[1], participante[2], participante[3], participante[0], participante[4])
             self.participantes.append(participante_obj)
 
     def setup_ui(self):
@@ -167,6 +807,16 @@ class SistemaGerenciamentoEventos:
         notebook.add(aba_inscricoes, text="Inscrições")
         self.setup_aba_inscricoes(aba_inscricoes)
 
+        # Aba de check-in
+        aba_checkin = ttk.Frame(notebook)
+        notebook.add(aba_checkin, text="Check-in")
+        self.setup_aba_checkin(aba_checkin)
+
+        # Aba de duplicatas
+        aba_duplicatas = ttk.Frame(notebook)
+        notebook.add(aba_duplicatas, text="Duplicatas")
+        self.setup_aba_duplicatas(aba_duplicatas)
+
         # Aba para salvar arquivos
         aba_serializar = ttk.Frame(notebook)
         notebook.add(aba_serializar, text="Salvar Arquivos")
@@ -208,6 +858,7 @@ class SistemaGerenciamentoEventos:
         """Atualiza os comboboxes de eventos e participantes."""
         self.combo_eventos['values'] = [evento.titulo for evento in self.eventos]
         self.combo_participantes['values'] = [participante.nome for participante in self.participantes]
+        self.combo_checkin_eventos['values'] = [evento.titulo for evento in self.eventos]
 
     def atualizar_tabelas(self):
         """Atualiza as tabelas de eventos e participantes na interface."""
@@ -217,7 +868,7 @@ class SistemaGerenciamentoEventos:
 
         self.tree_participantes.delete(*self.tree_participantes.get_children())
         for participante in self.participantes:
-            self.tree_participantes.insert("", "end", values=(participante.nome, participante.email, participante.telefone))
+            self.tree_participantes.insert("", "end", values=(participante.nome, participante.email, participante.telefone, participante.token_qr))
 
     def setup_aba_eventos(self, aba):
         """Configura a aba de gerenciamento de eventos."""
@@ -314,10 +965,11 @@ class SistemaGerenciamentoEventos:
         frame_lista = ttk.LabelFrame(aba, text="Lista de Participantes")
         frame_lista.pack(padx=10, pady=10, fill='both', expand=True)
 
-        self.tree_participantes = ttk.Treeview(frame_lista, columns=("#1", "#2", "#3"), show="headings")
+        self.tree_participantes = ttk.Treeview(frame_lista, columns=("#1", "#2", "#3", "#4"), show="headings")
         self.tree_participantes.heading("#1", text="Nome")
         self.tree_participantes.heading("#2", text="Email")
         self.tree_participantes.heading("#3", text="Telefone")
+        self.tree_participantes.heading("#4", text="Token QR")
         self.tree_participantes.pack(fill='both', expand=True)
 
     def setup_aba_inscricoes(self, aba):
@@ -354,6 +1006,211 @@ class SistemaGerenciamentoEventos:
         self.tree_inscricoes.pack(fill='both', expand=True)
 
         self.carregar_inscricoes()  # Carregar inscrições ao inicializar a aba
+
+    def setup_aba_checkin(self, aba):
+        """Configura a aba de check-in dos participantes no dia do evento."""
+        frame_form = ttk.LabelFrame(aba, text="Registrar Chegada")
+        frame_form.pack(padx=10, pady=10, fill='x')
+
+        ttk.Label(frame_form, text="Evento:").grid(row=0, column=0, sticky='w', padx=5, pady=5)
+        self.combo_checkin_eventos = ttk.Combobox(frame_form, state='readonly')
+        self.combo_checkin_eventos.grid(row=0, column=1, padx=5, pady=5)
+        self.combo_checkin_eventos.bind("<<ComboboxSelected>>", lambda _: self.atualizar_contador_checkin())
+
+        ttk.Label(frame_form, text="Email, telefone ou QR:").grid(row=1, column=0, sticky='w', padx=5, pady=5)
+        self.entry_checkin = ttk.Entry(frame_form, width=30)
+        self.entry_checkin.grid(row=1, column=1, padx=5, pady=5)
+        self.entry_checkin.bind("<Return>", lambda _: self.registrar_checkin())  # Leitores de QR enviam Enter
+
+        btn_registrar_checkin = ttk.Button(frame_form, text="Registrar Chegada", command=self.registrar_checkin)
+        btn_registrar_checkin.grid(row=2, column=0, columnspan=2, pady=10)
+
+        # Mensagem do último check-in (sem janelas de diálogo para não travar a fila)
+        self.label_checkin_status = ttk.Label(frame_form, text="", font=("Arial", 14))
+        self.label_checkin_status.grid(row=3, column=0, columnspan=3, sticky='w', padx=5, pady=5)
+
+        frame_contador = ttk.LabelFrame(aba, text="Chegadas")
+        frame_contador.pack(padx=10, pady=10, fill='x')
+
+        self.label_checkin_contador = ttk.Label(frame_contador, text="Selecione um evento.", font=("Arial", 20, "bold"))
+        self.label_checkin_contador.pack(padx=10, pady=10)
+
+        self.erro_presencas_avisado = False
+        self.atualizar_contador_checkin_periodicamente()
+
+    def atualizar_contador_checkin(self):
+        """Atualiza o contador de chegadas do evento selecionado."""
+        evento = next((e for e in self.eventos if e.titulo == self.combo_checkin_eventos.get()), None)
+        if not evento:
+            self.label_checkin_contador.config(text="Selecione um evento.")
+            return
+
+        self.cursor.execute("SELECT COUNT(*) FROM inscricoes WHERE evento_id = ?", (evento.id,))
+        inscritos = self.cursor.fetchone()[0]
+        chegadas = self.registro_presencas.chegadas(evento.id)
+        self.label_checkin_contador.config(text=f"{chegadas} / {inscritos} inscritos")
+
+    def atualizar_contador_checkin_periodicamente(self):
+        """Mantém o contador de chegadas atualizado enquanto a janela estiver aberta."""
+        self.atualizar_contador_checkin()
+
+        # Avisa uma única vez se a gravação das presenças parou
+        if self.registro_presencas.erro is not None and not self.erro_presencas_avisado:
+            self.erro_presencas_avisado = True
+            messagebox.showerror("Erro", f"As presenças não estão sendo gravadas: {self.registro_presencas.erro}")
+
+        self.root.after(1000, self.atualizar_contador_checkin_periodicamente)
+
+    def descarregar_presencas(self):
+        """Grava as presenças pendentes. Retorna False (e avisa o usuário) se a gravação falhou."""
+        try:
+            self.registro_presencas.descarregar()
+            return True
+        except RuntimeError as erro:
+            messagebox.showerror("Erro", str(erro))
+            return False
+
+    def registrar_checkin(self):
+        """Registra a chegada do participante informado no evento selecionado."""
+        evento = next((e for e in self.eventos if e.titulo == self.combo_checkin_eventos.get()), None)
+        if not evento:
+            messagebox.showerror("Erro", "Selecione um evento para o check-in.")
+            return
+
+        chave = self.entry_checkin.get()
+        if not chave.strip():
+            return
+
+        try:
+            status, nome = self.checkin.realizar_checkin(evento.id, chave)
+        except RuntimeError as erro:
+            messagebox.showerror("Erro", str(erro))
+            return
+        cor = "green" if status == CHECKIN_OK else "red"
+        self.label_checkin_status.config(text=MENSAGENS_CHECKIN[status].format(nome=nome), foreground=cor)
+
+        # Limpa o campo para a próxima leitura
+        self.entry_checkin.delete(0, tk.END)
+        self.atualizar_contador_checkin()
+
+    def setup_aba_duplicatas(self, aba):
+        """Configura a aba de detecção e mesclagem de participantes duplicados."""
+        frame_form = ttk.LabelFrame(aba, text="Participantes Duplicados")
+        frame_form.pack(padx=10, pady=10, fill='x')
+
+        self.btn_buscar_duplicatas = ttk.Button(frame_form, text="Buscar Duplicatas", command=self.buscar_duplicatas)
+        self.btn_buscar_duplicatas.grid(row=0, column=0, padx=5, pady=10)
+
+        self.btn_mesclar_duplicata = ttk.Button(frame_form, text="Mesclar", command=self.mesclar_duplicata)
+        self.btn_mesclar_duplicata.grid(row=0, column=1, padx=5, pady=10)
+
+        # Situação da busca, que roda em segundo plano
+        self.label_duplicatas_status = ttk.Label(frame_form, text="", foreground="gray", font=("Arial", 10))
+        self.label_duplicatas_status.grid(row=0, column=2, sticky='w', padx=5, pady=10)
+
+        # Adicionando aviso para mesclar
+        ttk.Label(frame_form, text="Selecione um par na lista para mesclar. O participante A é mantido.", foreground="gray", font=("Arial", 10)).grid(row=1, column=0, columnspan=2, sticky='w', padx=5, pady=(5, 15))
+
+        frame_lista = ttk.LabelFrame(aba, text="Lista de Possíveis Duplicatas")
+        frame_lista.pack(padx=10, pady=10, fill='both', expand=True)
+
+        self.tree_duplicatas = ttk.Treeview(frame_lista, columns=("#1", "#2", "#3", "#4"), show="headings")
+        self.tree_duplicatas.heading("#1", text="Participante A")
+        self.tree_duplicatas.heading("#2", text="Participante B")
+        self.tree_duplicatas.heading("#3", text="Motivo")
+        self.tree_duplicatas.heading("#4", text="Similaridade")
+        self.tree_duplicatas.pack(fill='both', expand=True)
+
+    def buscar_duplicatas(self):
+        """Inicia a busca de duplicatas numa thread, sem travar a janela (nem o check-in)."""
+        if str(self.btn_buscar_duplicatas['state']) == "disabled":
+            return  # Já há uma busca em andamento
+
+        self.btn_buscar_duplicatas.config(state="disabled")
+        self.btn_mesclar_duplicata.config(state="disabled")
+        self.label_duplicatas_status.config(text="Buscando duplicatas...")
+
+        resultado = queue.Queue()
+
+        def buscar():
+            conn = conectar(CAMINHO_DB)  # Conexões SQLite não podem ser compartilhadas entre threads
+            try:
+                resultado.put(self.detector_duplicatas.encontrar_duplicatas(conn))
+            except Exception as erro:
+                resultado.put(erro)  # A janela precisa sair do estado de busca mesmo em caso de falha
+            finally:
+                conn.close()
+
+        threading.Thread(target=buscar, daemon=True).start()
+        self.root.after(100, self.exibir_duplicatas, resultado)
+
+    def exibir_duplicatas(self, resultado):
+        """Preenche a lista de duplicatas quando a busca em segundo plano terminar."""
+        try:
+            pares = resultado.get_nowait()
+        except queue.Empty:
+            self.root.after(100, self.exibir_duplicatas, resultado)
+            return
+
+        self.btn_buscar_duplicatas.config(state="normal")
+        self.btn_mesclar_duplicata.config(state="normal")
+        if isinstance(pares, Exception):
+            self.label_duplicatas_status.config(text="")
+            messagebox.showerror("Erro", f"Não foi possível buscar duplicatas: {pares}")
+            return
+
+        participantes = {participante.id: participante for participante in self.participantes}
+        self.tree_duplicatas.delete(*self.tree_duplicatas.get_children())
+        for id_a, id_b, motivo, similaridade in pares:
+            if id_a not in participantes or id_b not in participantes:
+                continue  # Removido enquanto a busca rodava
+            a, b = participantes[id_a], participantes[id_b]
+            self.tree_duplicatas.insert("", "end", iid=f"{id_a}-{id_b}", values=(
+                f"{a.nome} ({a.email}, {a.telefone})",
+                f"{b.nome} ({b.email}, {b.telefone})",
+                motivo.capitalize(),
+                f"{similaridade:.0%}"
+            ))
+        self.label_duplicatas_status.config(text=f"{len(self.tree_duplicatas.get_children())} pares encontrados.")
+
+    def mesclar_duplicata(self):
+        """Mescla o par de participantes selecionado, mantendo o participante A."""
+        selected_item = self.tree_duplicatas.selection()
+        if not selected_item:
+            messagebox.showerror("Erro", "Selecione um par de participantes para mesclar.")
+            return
+
+        participante_a, participante_b = self.tree_duplicatas.item(selected_item, 'values')[:2]
+        if not messagebox.askyesno(
+            "Confirmar",
+            f"Mesclar os participantes?\n\nManter: {participante_a}\nRemover: {participante_b}\n\n"
+            "As inscrições do participante removido passarão para o mantido."
+        ):
+            return
+
+        manter_id, remover_id = (int(i) for i in selected_item[0].split("-"))
+        try:
+            self.detector_duplicatas.mesclar(manter_id, remover_id, self.registro_presencas)
+        except ValueError as erro:
+            messagebox.showerror("Erro", str(erro))
+            self.buscar_duplicatas()
+            return
+
+        # Recarregar os dados para refletir a mesclagem
+        self.carregar_dados()
+        self.atualizar_tabelas()
+        self.atualizar_comboboxes()
+        self.carregar_inscricoes()
+        self.buscar_duplicatas()
+        messagebox.showinfo("Sucesso", "Participantes mesclados com sucesso!")
+
+    def encerrar(self):
+        """Grava as presenças pendentes e fecha o programa."""
+        self.registro_presencas.fechar()
+        if self.registro_presencas.erro is not None:
+            messagebox.showerror("Erro", f"Algumas presenças podem não ter sido gravadas: {self.registro_presencas.erro}")
+        self.conn.close()
+        self.root.destroy()
     
     def carregar_inscricoes(self):
         """Carrega as inscrições do banco de dados e exibe na tabela."""
@@ -419,9 +1276,14 @@ class SistemaGerenciamentoEventos:
         evento = next((e for e in self.eventos if e.titulo == evento_titulo), None)
 
         if evento:
-            # Remover todas as inscrições associadas ao evento
+            if not self.descarregar_presencas():
+                return
+
+            # Remover todas as inscrições e presenças associadas ao evento
             self.cursor.execute("DELETE FROM inscricoes WHERE evento_id = ?", (evento.id,))
+            self.cursor.execute("DELETE FROM presencas WHERE evento_id = ?", (evento.id,))
             self.conn.commit()
+            self.registro_presencas.descartar(evento_id=evento.id)
 
             # Agora remover o evento
             self.cursor.execute("DELETE FROM eventos WHERE id = ?", (evento.id,))
@@ -442,9 +1304,9 @@ class SistemaGerenciamentoEventos:
 
     def cadastrar_participante(self):
         """Cadastra um novo participante."""
-        nome = self.entry_nome.get()
-        email = self.entry_email.get()
-        telefone = self.entry_telefone.get()
+        nome = self.entry_nome.get().strip()
+        email = self.entry_email.get().strip()
+        telefone = self.entry_telefone.get().strip()
 
         # Verificar se o email é válido usando uma expressão regular
         if not self.email_valido(email):
@@ -456,27 +1318,39 @@ class SistemaGerenciamentoEventos:
             messagebox.showerror("Erro", "O telefone fornecido é inválido. Deve conter entre 10 a 15 dígitos.")
             return
         
-        # Verificar se o email já está cadastrado
-        self.cursor.execute("SELECT COUNT(*) FROM participantes WHERE email = ?", (email,))
+        # Verificar se o email já está cadastrado (ignorando maiúsculas e espaços)
+        email_canonico = normalizar_email(email)
+        self.cursor.execute(
+            "SELECT (SELECT COUNT(*) FROM participantes WHERE email_canonico = ?) + (SELECT COUNT(*) FROM participantes_mesclados WHERE email_canonico = ?)",
+            (email_canonico, email_canonico)
+        )
         if self.cursor.fetchone()[0] > 0:
             messagebox.showerror("Erro", "Já existe um participante cadastrado com este email.")
             return
 
-        # Verificar se o telefone já está cadastrado
-        self.cursor.execute("SELECT COUNT(*) FROM participantes WHERE telefone = ?", (telefone,))
+        # Verificar se o telefone já está cadastrado (ignorando formatação e código do país)
+        telefone_canonico = normalizar_telefone(telefone)
+        self.cursor.execute(
+            "SELECT (SELECT COUNT(*) FROM participantes WHERE telefone_canonico = ?) + (SELECT COUNT(*) FROM participantes_mesclados WHERE telefone_canonico = ?)",
+            (telefone_canonico, telefone_canonico)
+        )
         if self.cursor.fetchone()[0] > 0:
             messagebox.showerror("Erro", "Já existe um participante cadastrado com este telefone.")
             return
 
         # Inserir participante no banco de dados
-        self.cursor.execute("INSERT INTO participantes (nome, email, telefone) VALUES (?, ?, ?)", (nome, email, telefone))
+        token_qr = gerar_token_qr()
+        self.cursor.execute(
+            "INSERT INTO participantes (nome, email, telefone, token_qr, email_canonico, telefone_canonico) VALUES (?, ?, ?, ?, ?, ?)",
+            (nome, email, telefone, token_qr, email_canonico, telefone_canonico)
+        )
         self.conn.commit()
 
         # Recuperar o id gerado para o participante
         participante_id = self.cursor.lastrowid
 
         # Criar o objeto participante com o id
-        participante = Participante(nome, email, telefone, participante_id)
+        participante = Participante(nome, email, telefone, participante_id, token_qr)
 
         # Adicionar o participante à lista
         self.participantes.append(participante)
@@ -497,9 +1371,18 @@ class SistemaGerenciamentoEventos:
         participante = next((p for p in self.participantes if p.nome == participante_nome), None)
 
         if participante:
-            # Remover todas as inscrições associadas ao participante
+            if not self.descarregar_presencas():
+                return
+
+            # Remover todas as inscrições e presenças associadas ao participante (e aos cadastros mesclados a ele)
             self.cursor.execute("DELETE FROM inscricoes WHERE participante_id = ?", (participante.id,))
+            self.cursor.execute(
+                "DELETE FROM presencas WHERE participante_id = ? OR participante_id IN (SELECT antigo_id FROM participantes_mesclados WHERE novo_id = ?)",
+                (participante.id, participante.id)
+            )
+            self.cursor.execute("DELETE FROM participantes_mesclados WHERE novo_id = ?", (participante.id,))
             self.conn.commit()
+            self.registro_presencas.descartar(participante_id=participante.id)
 
             # Agora remover o participante
             self.cursor.execute("DELETE FROM participantes WHERE id = ?", (participante.id,))
@@ -508,6 +1391,11 @@ class SistemaGerenciamentoEventos:
             self.atualizar_tabelas()
             self.atualizar_comboboxes()
             self.carregar_inscricoes()  # Atualiza a lista de inscrições
+
+            # Retirar da lista de duplicatas os pares com o participante removido
+            for par in self.tree_duplicatas.get_children():
+                if str(participante.id) in par.split("-"):
+                    self.tree_duplicatas.delete(par)
             messagebox.showinfo("Sucesso", "Participante removido com sucesso!")
     
     def email_valido(self, email):
@@ -577,9 +1465,18 @@ class SistemaGerenciamentoEventos:
         participante = next((p for p in self.participantes if p.nome == participante_nome), None)
 
         if evento and participante:
-            # Remover a inscrição do banco de dados
+            if not self.descarregar_presencas():
+                return
+
+            # Remover a inscrição (e a presença, se houver) do banco de dados
             self.cursor.execute("DELETE FROM inscricoes WHERE evento_id = ? AND participante_id = ?", (evento.id, participante.id))
+            self.cursor.execute(
+                '''DELETE FROM presencas WHERE evento_id = ? AND (participante_id = ? OR participante_id IN
+                   (SELECT antigo_id FROM participantes_mesclados WHERE novo_id = ?))''',
+                (evento.id, participante.id, participante.id)
+            )
             self.conn.commit()
+            self.registro_presencas.descartar(evento.id, participante.id)
 
             # Atualizar a lista de inscrições na interface
             self.carregar_inscricoes()
@@ -686,6 +1583,12 @@ class SistemaGerenciamentoEventos:
 # ------------------------- EXECUÇÃO DO PROGRAMA -------------------------
 
 if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark_checkin()
+        sys.exit()
+    if "--verificar-duplicatas" in sys.argv:
+        sys.exit(0 if verificar_duplicatas() else 1)
+
     root = tk.Tk()
     app = SistemaGerenciamentoEventos(root)
     root.mainloop()
\ No newline at end of file